@@ -0,0 +1,678 @@
+#!/usr/bin/env python3
+"""Produce a shareable copy of a service config tree with secrets redacted.
+
+Copies a config directory (apache sites, pxe-server templates, sysmon
+exports, devcontainer definitions, service databases, ...) to an output
+directory and replaces API keys, passwords, tokens and similar values
+with PLACEHOLDER_* markers so the tree can be attached to bug reports or
+published without leaking credentials.
+
+XML comments survive sanitization on both the lxml and stdlib backends:
+in-tree comments are kept by the parser, and the bytes preceding the
+root element (licence headers and the like) are re-emitted verbatim on
+the stdlib backend, which would otherwise drop them.
+
+Usage:
+    sanitize_configs.py SOURCE_DIR OUTPUT_DIR
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    # libxml2-backed parser/serializer, noticeably faster on large XML.
+    from lxml import etree as ET
+    _XML_PARSE_ERROR = ET.XMLSyntaxError
+    _USING_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _XML_PARSE_ERROR = ET.ParseError
+    _USING_LXML = False
+
+
+CONFIG_SUFFIXES = {'.conf', '.cfg', '.ini', '.yml', '.yaml', '.env',
+                   '.template', '.txt', '.config'}
+
+REPORT_FILENAME = 'sanitization-report.json'
+CACHE_FILENAME = '.sanitization-cache.json'
+
+# Substrings that mark a key/column/tag name as sensitive ('pass' also
+# covers password, 'user' also covers username). 'auth' must not continue
+# with a letter so author/authority/authored_on keep their data, while
+# auth_token, authorization and authentication still match.
+_SENSITIVE_KEY_RE = re.compile(
+    r'api[_-]?key|secret|token|auth(?:orization|entication)?(?![a-z])'
+    r'|user|pass|credential', re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def _is_sensitive_key(key):
+    """Whether a key/column/tag name looks like it holds a credential."""
+    return _SENSITIVE_KEY_RE.search(key) is not None
+
+
+def _iterparse(stream):
+    """iterparse wrapper that keeps in-tree comments on both XML backends.
+
+    lxml retains comments by default; the stdlib parser drops them unless
+    the TreeBuilder is told to insert them.
+    """
+    if _USING_LXML:
+        return ET.iterparse(stream, events=('end',))
+    builder = ET.TreeBuilder(insert_comments=True, insert_pis=True)
+    return ET.iterparse(stream, events=('end',),
+                        parser=ET.XMLParser(target=builder))
+
+
+def _preroot_bytes(data):
+    """Everything before the root element: declaration, comments, PIs.
+
+    The stdlib serializer only writes the tree, so this prefix (licence
+    headers live here) is re-emitted verbatim on that backend.
+    """
+    i = 0
+    while True:
+        j = data.find(b'<', i)
+        if j < 0:
+            return b''
+        if data.startswith(b'<?', j):
+            end = data.find(b'?>', j)
+        elif data.startswith(b'<!--', j):
+            end = data.find(b'-->', j)
+            end = end + 1 if end >= 0 else -1
+        elif data.startswith(b'<!', j):
+            end = data.find(b'>', j) - 1
+        else:
+            return data[:j]
+        if end < 0:
+            return b''
+        i = end + 2
+
+
+@lru_cache(maxsize=512)
+def _placeholder_for(key):
+    """Placeholder for a named key; cached since key names repeat a lot."""
+    return f"PLACEHOLDER_{key.upper()}"
+
+
+class ConfigSanitizer:
+    """Copies a config tree and scrubs sensitive values from the copy."""
+
+    def __init__(self, source_dir, output_dir):
+        self.source_dir = Path(source_dir)
+        self.output_dir = Path(output_dir)
+        self.stats = {
+            'files_processed': 0,
+            'sensitive_items_found': 0,
+            'sensitive_items_sanitized': 0,
+            'errors': 0,
+        }
+        self._stats_lock = threading.Lock()
+        # Output paths whose sanitization failed this run; they are dropped
+        # from the cache so the next run retries them instead of treating
+        # the raw copy as done.
+        self._failed_paths = set()
+
+        # Every combined-pattern match necessarily contains one of these
+        # substrings, so a file without any of them can skip the regex
+        # scan after one cheap pass.
+        self._probe_keywords = (b'key', b'pass', b'secret', b'token',
+                                b'auth', b'user', b'credential')
+        if ahocorasick is not None:
+            # One linear sweep over the text for all keywords at once
+            # instead of one substring search per keyword.
+            self._probe_automaton = ahocorasick.Automaton()
+            for keyword in self._probe_keywords:
+                self._probe_automaton.add_word(keyword.decode(), True)
+            self._probe_automaton.make_automaton()
+        else:
+            self._probe_automaton = None
+
+        # Each pattern captures (prefix)(value); the prefix is kept and the
+        # value replaced with a per-category placeholder. Keywords are
+        # word-bounded so e.g. 'author' never matches the auth pattern, and
+        # casing is handled by IGNORECASE rather than per-case variants.
+        # Values stop at quotes, whitespace and structural punctuation
+        # (, } ] )) so inline YAML/JSON stays well-formed, but a whole
+        # ${...} interpolation is accepted as one value.
+        self.sensitive_patterns = {
+            'api_keys': [
+                r'("?\bapi[_-]?key\b"?\s*[:=]\s*["\']?)(\$\{[^}]*\}|[^"\'<>\s,)\]}]+)',
+                r'(<apikey>)([^<]+)',
+            ],
+            'passwords': [
+                r'("?\b(?:rpc-|control)?pass(?:word|phrase)?\b"?\s*[:=]\s*["\']?)(\$\{[^}]*\}|[^"\'<>\s,)\]}]+)',
+                r'(<password>)([^<]+)',
+            ],
+            'secrets': [
+                r'("?\b(?:client[_-]?)?secret\b"?\s*[:=]\s*["\']?)(\$\{[^}]*\}|[^"\'<>\s,)\]}]+)',
+            ],
+            'tokens': [
+                r'("?\b(?:access[_-]?|refresh[_-]?)?token\b"?\s*[:=]\s*["\']?)(\$\{[^}]*\}|[^"\'<>\s,)\]}]+)',
+            ],
+            'auth': [
+                r'("?\bauth(?:orization)?\b"?\s*[:=]\s*["\']?)(\$\{[^}]*\}|[^"\'<>\s,)\]}]+)',
+            ],
+            'usernames': [
+                r'("?\buser[_-]?name\b"?\s*[:=]\s*["\']?)(\$\{[^}]*\}|[^"\'<>\s,)\]}]+)',
+                r'(<username>)([^<]+)',
+            ],
+        }
+
+        # All patterns are combined into a single alternation compiled once
+        # here, so every text chunk is scanned in one pass instead of once
+        # per pattern.
+        self._pattern_categories = []
+        self._group_placeholders = {}
+        self._combined_pattern = self._build_combined_pattern()
+
+        # Pre-bind the scan entry point and close the replacement callback
+        # over its lookup table so the per-match path runs with plain local
+        # lookups -- no attribute or global access left in the hot loop.
+        self._subn = self._combined_pattern.subn
+        table = self._group_placeholders
+
+        def _replace_match(match, _table=table):
+            keep_group, placeholder = _table[match.lastgroup]
+            return match.group(keep_group) + placeholder
+
+        self._replace_match = _replace_match
+
+    def _build_combined_pattern(self):
+        """Combine all category patterns into one compiled alternation.
+
+        Each source pattern has exactly the shape (prefix)(value); the two
+        groups are renamed k<i>/v<i> so a match can be traced back to its
+        category via the group name.
+        """
+        parts = []
+        for category, patterns in self.sensitive_patterns.items():
+            for pattern in patterns:
+                index = len(self._pattern_categories)
+                head, _, value = pattern.rpartition('(')
+                parts.append(head.replace('(', f'(?P<k{index}>', 1)
+                             + f'(?P<v{index}>' + value)
+                self._pattern_categories.append(category)
+                placeholder = 'PLACEHOLDER_' + category.upper().rstrip('S')
+                self._group_placeholders[f'v{index}'] = (f'k{index}',
+                                                         placeholder.encode())
+        # Compiled in bytes mode: file contents are scanned as raw bytes,
+        # skipping a UTF-8 decode/encode round trip per file.
+        return re.compile('|'.join(parts).encode(), re.IGNORECASE)
+
+    def sanitize_all(self):
+        """Run the full copy + sanitize + report pipeline."""
+        print(f"Sanitizing {self.source_dir} -> {self.output_dir}")
+        self._copy_configs()
+        buckets, total_files = self._collect_files()
+        self._sanitize_databases_parallel(buckets['db'])
+        tasks = [('xml', path) for path in buckets['xml']]
+        tasks += [('json', path) for path in buckets['json']]
+        tasks += [('text', path) for path in buckets['text']]
+        self._sanitize_files_parallel(tasks)
+        self._generate_report(total_files)
+        # A file that failed to sanitize must not be remembered as done, or
+        # the next run would skip it and ship the raw copy.
+        for path in self._failed_paths:
+            rel_key = os.path.relpath(path, self.output_dir)
+            self._cache.pop(rel_key, None)
+        self._write_cache()
+        return self.stats
+
+    def _collect_files(self):
+        """Classify every file under output_dir in a single directory walk.
+
+        One scandir-based walk replaces the per-category rglob passes, so
+        the tree is read once instead of once per file type.
+        """
+        buckets = {'db': [], 'xml': [], 'json': [], 'text': []}
+        total_files = 0
+        stack = [self.output_dir]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    rel_key = os.path.relpath(entry.path, self.output_dir)
+                    if rel_key in (REPORT_FILENAME, CACHE_FILENAME):
+                        continue
+                    total_files += 1
+                    if rel_key in self._unchanged:
+                        continue
+                    suffix = os.path.splitext(entry.name)[1].lower()
+                    if suffix == '.db':
+                        buckets['db'].append(Path(entry.path))
+                    elif suffix == '.xml':
+                        buckets['xml'].append(Path(entry.path))
+                    elif suffix == '.json':
+                        buckets['json'].append(Path(entry.path))
+                    elif (suffix in CONFIG_SUFFIXES
+                          or entry.name.lower() in CONFIG_SUFFIXES):
+                        # The name check catches files like '.env', whose
+                        # whole name is the "suffix" and splitext sees none.
+                        buckets['text'].append(Path(entry.path))
+        return buckets, total_files
+
+    def _sanitize_files_parallel(self, tasks):
+        """Sanitize independent files across CPU cores.
+
+        Each file's work is self-contained apart from the stats counters,
+        so workers return their counter deltas plus any failed paths and
+        the parent accumulates them.
+        """
+        if not tasks:
+            return
+        with ProcessPoolExecutor(initializer=_init_worker,
+                                 initargs=(self.source_dir,
+                                           self.output_dir)) as executor:
+            for delta, failed in executor.map(_sanitize_file_task, tasks,
+                                              chunksize=16):
+                for key, value in delta.items():
+                    self.stats[key] += value
+                self._failed_paths.update(failed)
+
+    def _copy_configs(self):
+        """Copy the source tree, skipping files unchanged since the last run.
+
+        A sidecar cache maps relative path to source content hash; a file
+        whose hash matches was already copied and sanitized by a previous
+        run, so both its copy and its sanitization pass are skipped.
+        """
+        cache = self._load_cache()
+        self._cache = {}
+        self._unchanged = set()
+        seen = set()
+        seen_dirs = set()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for item in self.source_dir.rglob('*'):
+            relative = item.relative_to(self.source_dir)
+            output_path = self.output_dir / relative
+            if item.is_dir():
+                seen_dirs.add(str(relative))
+                output_path.mkdir(parents=True, exist_ok=True)
+            elif item.is_file():
+                rel_key = str(relative)
+                seen.add(rel_key)
+                try:
+                    digest = self._hash_file(item)
+                    if cache.get(rel_key) == digest and output_path.is_file():
+                        self._cache[rel_key] = digest
+                        self._unchanged.add(rel_key)
+                        continue
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    self._copy_file(item, output_path)
+                    # Recorded only after the copy completed, so a partial
+                    # copy is redone rather than trusted next run.
+                    self._cache[rel_key] = digest
+                except OSError as exc:
+                    print(f"warning: could not copy {item}: {exc}")
+                    self.stats['errors'] += 1
+        self._prune_output(seen, seen_dirs)
+
+    def _load_cache(self):
+        try:
+            with open(self.output_dir / CACHE_FILENAME, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_cache(self):
+        with open(self.output_dir / CACHE_FILENAME, 'w',
+                  encoding='utf-8') as f:
+            json.dump(self._cache, f, indent=2)
+
+    @staticmethod
+    def _hash_file(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _prune_output(self, seen, seen_dirs):
+        """Drop output files/dirs whose source disappeared since the last run.
+
+        Only directories with no source counterpart are candidates for
+        removal, so empty directories that exist in the source stay mirrored
+        and output_dir itself is never touched.
+        """
+        for dirpath, _, filenames in os.walk(self.output_dir, topdown=False):
+            for name in filenames:
+                path = Path(dirpath) / name
+                rel_key = str(path.relative_to(self.output_dir))
+                if rel_key in (REPORT_FILENAME, CACHE_FILENAME):
+                    continue
+                if rel_key not in seen:
+                    path.unlink()
+            rel_dir = os.path.relpath(dirpath, self.output_dir)
+            if rel_dir == '.' or rel_dir in seen_dirs:
+                continue
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _copy_file(src, dst):
+        """Copy file contents without metadata.
+
+        Most copies are rewritten by the sanitizers right after, so the
+        mtime/mode preservation shutil.copy2 does is wasted work. Uses
+        zero-copy os.sendfile where the kernel supports it.
+        """
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            offset = 0
+            try:
+                while True:
+                    sent = os.sendfile(fdst.fileno(), fsrc.fileno(),
+                                       offset, 1 << 24)
+                    if not sent:
+                        break
+                    offset += sent
+            except OSError:
+                if offset:
+                    raise
+                fsrc.seek(0)
+                shutil.copyfileobj(fsrc, fdst)
+
+    def _sanitize_databases_parallel(self, db_files):
+        """Sanitize DB files concurrently.
+
+        sqlite3 releases the GIL during C-level work, so threads overlap
+        nicely when there are several databases; each worker opens its own
+        connection. Worker count honours -X cpu_count where the runtime
+        supports it.
+        """
+        if not db_files:
+            return
+        cpu_count = getattr(os, 'process_cpu_count', os.cpu_count)() or 1
+        workers = min(8, cpu_count, len(db_files))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(self._sanitize_sqlite_database, db_files))
+
+    def _sanitize_sqlite_database(self, db_path):
+        try:
+            conn = sqlite3.connect(db_path, isolation_level=None)
+            cursor = conn.cursor()
+            # The output DB is a disposable copy, so trade durability for
+            # throughput and batch all updates into one transaction instead
+            # of paying a journal sync per statement.
+            cursor.execute("PRAGMA journal_mode=OFF")
+            cursor.execute("PRAGMA synchronous=OFF")
+            cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            tables = [row[0] for row in cursor.fetchall()]
+            found = 0
+            cursor.execute("BEGIN IMMEDIATE")
+            for table in tables:
+                cursor.execute(f'PRAGMA table_info("{table}")')
+                columns = [row[1] for row in cursor.fetchall()]
+                sensitive_cols = [c for c in columns if _is_sensitive_key(c)]
+                if not sensitive_cols:
+                    continue
+                # One statement per table instead of one per column: each
+                # column keeps its NULL/empty values via CASE so nothing is
+                # fabricated, and the WHERE clause limits the write to rows
+                # that actually hold something.
+                non_empty = {c: f'"{c}" IS NOT NULL AND "{c}" != \'\''
+                             for c in sensitive_cols}
+                set_clause = ', '.join(
+                    f'"{c}" = CASE WHEN {non_empty[c]} THEN ? ELSE "{c}" END'
+                    for c in sensitive_cols)
+                where_clause = ' OR '.join(non_empty.values())
+                placeholders = tuple(_placeholder_for(c)
+                                     for c in sensitive_cols)
+                cursor.execute(
+                    f'UPDATE "{table}" SET {set_clause} WHERE {where_clause}',
+                    placeholders)
+                found += cursor.rowcount
+            conn.commit()
+            conn.close()
+            with self._stats_lock:
+                self.stats['sensitive_items_found'] += found
+                self.stats['sensitive_items_sanitized'] += found
+                self.stats['files_processed'] += 1
+        except sqlite3.Error as exc:
+            print(f"warning: could not sanitize database {db_path}: {exc}")
+            with self._stats_lock:
+                self.stats['errors'] += 1
+                self._failed_paths.add(Path(db_path))
+
+    def _sanitize_xml_file(self, xml_path):
+        try:
+            with open(xml_path, 'rb') as f:
+                data = f.read()
+            # Sanitize each element as its end tag is parsed instead of
+            # building the tree first and walking it again with recursive
+            # Python calls. The tree is still kept around because the same
+            # file is rewritten in place afterwards.
+            root = None
+            found = 0
+            for _, element in _iterparse(io.BytesIO(data)):
+                found += self._sanitize_xml_element(element)
+                root = element
+            tree = ET.ElementTree(root)
+            if _USING_LXML:
+                # lxml keeps pre-root comments in the tree itself.
+                tree.write(xml_path, encoding='utf-8', xml_declaration=True)
+            else:
+                prefix = _preroot_bytes(data)
+                with open(xml_path, 'wb') as f:
+                    if b'<?xml' not in prefix:
+                        f.write(b"<?xml version='1.0' encoding='utf-8'?>\n")
+                    f.write(prefix)
+                    tree.write(f, encoding='utf-8', xml_declaration=False)
+            if found:
+                self.stats['sensitive_items_found'] += found
+                self.stats['sensitive_items_sanitized'] += found
+            self.stats['files_processed'] += 1
+        except _XML_PARSE_ERROR:
+            # Not well-formed XML; text-scan the bytes already in hand.
+            self._sanitize_buffered_text(xml_path, data)
+        except OSError as exc:
+            print(f"warning: could not sanitize {xml_path}: {exc}")
+            self.stats['errors'] += 1
+            self._failed_paths.add(Path(xml_path))
+
+    def _sanitize_xml_element(self, element):
+        """Sanitize one element's attributes and text; returns hit count.
+
+        Counts are accumulated locally and merged into self.stats by the
+        caller once per file rather than once per hit.
+        """
+        if not isinstance(element.tag, str):
+            # Comment/processing-instruction node; nothing to sanitize.
+            return 0
+        found = 0
+        for key, value in element.attrib.items():
+            if not value:
+                continue
+            if _is_sensitive_key(key):
+                element.set(key, _placeholder_for(key))
+                found += 1
+            else:
+                element.set(key, self._sanitize_text_content(value))
+        if element.text and element.text.strip():
+            tag = element.tag.rpartition('}')[2]
+            if _is_sensitive_key(tag):
+                element.text = _placeholder_for(tag)
+                found += 1
+            else:
+                element.text = self._sanitize_text_content(element.text)
+        return found
+
+    def _sanitize_json_file(self, json_path):
+        try:
+            with open(json_path, 'rb') as f:
+                raw = f.read()
+            if orjson is not None:
+                data = orjson.loads(raw)
+            else:
+                data = json.loads(raw)
+            sanitized = self._sanitize_json_object(data)
+            if orjson is not None:
+                with open(json_path, 'wb') as f:
+                    f.write(orjson.dumps(sanitized,
+                                         option=orjson.OPT_INDENT_2))
+            else:
+                with open(json_path, 'w', encoding='utf-8') as f:
+                    json.dump(sanitized, f, indent=2)
+            self.stats['files_processed'] += 1
+        except ValueError:
+            # Comments or trailing commas (devcontainer.json and friends);
+            # text-scan the bytes already in hand.
+            self._sanitize_buffered_text(json_path, raw)
+        except OSError as exc:
+            print(f"warning: could not sanitize {json_path}: {exc}")
+            self.stats['errors'] += 1
+            self._failed_paths.add(Path(json_path))
+
+    def _sanitize_json_object(self, obj):
+        if isinstance(obj, dict):
+            sanitized = {}
+            found = 0
+            for key, value in obj.items():
+                # A string under a sensitive key is replaced wholesale, so
+                # running the pattern scan over it first would be wasted.
+                if _is_sensitive_key(key) and isinstance(value, str) and value:
+                    value = _placeholder_for(key)
+                    found += 1
+                else:
+                    value = self._sanitize_json_object(value)
+                sanitized[key] = value
+            if found:
+                self.stats['sensitive_items_found'] += found
+                self.stats['sensitive_items_sanitized'] += found
+            return sanitized
+        if isinstance(obj, list):
+            return [self._sanitize_json_object(item) for item in obj]
+        if isinstance(obj, str):
+            return self._sanitize_text_content(obj)
+        return obj
+
+    def _sanitize_text_file(self, path):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError as exc:
+            print(f"warning: could not sanitize {path}: {exc}")
+            self.stats['errors'] += 1
+            self._failed_paths.add(Path(path))
+            return
+        self._sanitize_buffered_text(path, data)
+
+    def _sanitize_buffered_text(self, path, data):
+        """Text-scan already-read contents and rewrite the file if needed."""
+        try:
+            sanitized = self._sanitize_text_bytes(data)
+            if sanitized != data:
+                with open(path, 'wb') as f:
+                    f.write(sanitized)
+            self.stats['files_processed'] += 1
+        except OSError as exc:
+            print(f"warning: could not sanitize {path}: {exc}")
+            self.stats['errors'] += 1
+            self._failed_paths.add(Path(path))
+
+    def _sanitize_text_bytes(self, data):
+        if not self._contains_probe_keyword(data.lower()):
+            return data
+        sanitized, count = self._subn(self._replace_match, data)
+        if count:
+            self.stats['sensitive_items_found'] += count
+            self.stats['sensitive_items_sanitized'] += count
+        return sanitized
+
+    def _contains_probe_keyword(self, lowered):
+        if self._probe_automaton is not None:
+            probe = lowered.decode('latin-1')
+            return next(self._probe_automaton.iter(probe), None) is not None
+        return any(keyword in lowered for keyword in self._probe_keywords)
+
+    def _sanitize_text_content(self, text):
+        """str front-end to the bytes scanner for XML/JSON values."""
+        return self._sanitize_text_bytes(text.encode('utf-8')).decode('utf-8')
+
+    def _generate_report(self, total_files):
+        report = {
+            'generated': datetime.now().isoformat(timespec='seconds'),
+            'source': str(self.source_dir),
+            'output': str(self.output_dir),
+            'total_files': total_files,
+            'stats': self.stats,
+        }
+        report_path = self.output_dir / 'sanitization-report.json'
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Processed {self.stats['files_processed']} files, "
+              f"sanitized {self.stats['sensitive_items_sanitized']} items "
+              f"({self.stats['errors']} errors)")
+
+
+# Per-process sanitizer used by the pool workers; built once per worker in
+# _init_worker so patterns are compiled once per process, not per file.
+_worker = None
+
+
+def _init_worker(source_dir, output_dir):
+    global _worker
+    _worker = ConfigSanitizer(source_dir, output_dir)
+
+
+def _sanitize_file_task(task):
+    kind, path = task
+    for key in _worker.stats:
+        _worker.stats[key] = 0
+    _worker._failed_paths.clear()
+    if kind == 'xml':
+        _worker._sanitize_xml_file(path)
+    elif kind == 'json':
+        _worker._sanitize_json_file(path)
+    else:
+        _worker._sanitize_text_file(path)
+    return dict(_worker.stats), list(_worker._failed_paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Copy a config tree with sensitive values redacted")
+    parser.add_argument('source_dir', help="config tree to sanitize")
+    parser.add_argument('output_dir', help="where to write the sanitized copy")
+    args = parser.parse_args()
+
+    if not Path(args.source_dir).is_dir():
+        parser.error(f"{args.source_dir} is not a directory")
+
+    sanitizer = ConfigSanitizer(args.source_dir, args.output_dir)
+    stats = sanitizer.sanitize_all()
+    return 1 if stats['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())